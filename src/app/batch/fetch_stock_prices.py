@@ -6,19 +6,30 @@ yfinanceを使用して1分足の株価データを取得し、
 
 import asyncio
 import logging
+from datetime import UTC, datetime
+from functools import partial
 from typing import Annotated
 
 import typer
 
+try:
+    import uvloop
+except ImportError:  # Windows・PyPy向けのuvloopは提供されていない
+    uvloop = None  # type: ignore[assignment]
+
 from app.common.log_prefix import LogPrefix
-from app.database.database import AsyncSessionFactory
+from app.database.database import (
+    get_async_session_factory,
+    warm_up_connection_pool,
+)
+from app.database.model.ticker import Ticker
 from app.database.repository.stock_price_1m_repository import (
     StockPrice1mRepository,
 )
 from app.database.repository.ticker_repository import TickerRepository
 from app.infra.external.yfinance_fetcher import YFinanceFetcher
 from app.settings.settings import get_settings
-from app.stock_price.service import StockPriceService
+from app.stock_price.service import StockPriceService, get_fetch_window
 
 app = typer.Typer()
 
@@ -29,6 +40,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_BATCH_START_LOG_FMT = (
+    f"{LogPrefix.BATCH_JOB} Starting with days=%s, ticker=%s, dry_run=%s, "
+    "max_workers=%s"
+)
+_BATCH_COMPLETED_LOG_MSG = f"{LogPrefix.BATCH_JOB} Completed"
+
 
 @app.command()
 def main(
@@ -38,6 +55,10 @@ def main(
         bool,
         typer.Option(help="ドライランモード(DB書き込みなし)"),
     ] = False,
+    max_workers: Annotated[
+        int | None,
+        typer.Option(help="同時に処理する銘柄数", min=1),
+    ] = None,
 ) -> None:
     """株価データを取得してDBに取り込む.
 
@@ -46,18 +67,32 @@ def main(
         days: 取得する過去日数
         ticker: 特定銘柄のみ取得する場合に指定
         dry_run: ドライランモード
+        max_workers: 同時に処理する銘柄数
 
     """
     if days is None:
         days = settings.batch_lookback_days
+    if max_workers is None:
+        max_workers = settings.batch_concurrency
 
-    asyncio.run(fetch_stock_prices(days=days, ticker=ticker, dry_run=dry_run))
+    # await回数の多いDB・取得処理のオーバーヘッドを抑えるためuvloopで実行する。
+    # uvloopが利用できない環境では標準のイベントループを使う
+    asyncio.run(
+        fetch_stock_prices(
+            days=days,
+            ticker=ticker,
+            dry_run=dry_run,
+            max_workers=max_workers,
+        ),
+        loop_factory=uvloop.new_event_loop if uvloop else None,
+    )
 
 
 async def fetch_stock_prices(
     days: int,
     ticker: str | None,
     dry_run: bool,
+    max_workers: int,
 ) -> None:
     """株価データを非同期で取得・取り込み.
 
@@ -66,31 +101,80 @@ async def fetch_stock_prices(
         days: 取得する過去日数
         ticker: 特定銘柄のみ取得する場合に指定
         dry_run: ドライランモード
+        max_workers: 同時に処理する銘柄数
 
     """
-    logger.info(
-        f"{LogPrefix.BATCH_JOB} Starting with days={days}, "
-        f"ticker={ticker}, dry_run={dry_run}"
-    )
+    logger.info(_BATCH_START_LOG_FMT, days, ticker, dry_run, max_workers)
 
-    async with AsyncSessionFactory() as session:
-        service = StockPriceService(
-            ticker_repo=TickerRepository(session),
-            price_repo=StockPrice1mRepository(session),
-        )
-        fetcher = YFinanceFetcher(
-            max_retries=settings.batch_max_retries,
-            retry_delay=settings.batch_retry_delay_seconds,
-        )
-
-        await service.process_all_tickers(
-            fetcher=fetcher,
-            days=days,
+    # 取り込みはORMのインスタンスを経由しないため、クエリごとのautoflushは不要
+    # (expire_on_commitはセッションファクトリで無効化済み)
+    session_factory = partial(get_async_session_factory(), autoflush=False)
+    async with session_factory() as session:
+        tickers = await TickerRepository(session).get_active_tickers(
             specific_ticker=ticker,
-            dry_run=dry_run,
         )
+        # 全銘柄で同じ取得期間を使い、既存データ範囲も1回のクエリで取得する
+        start_date, end_date = get_fetch_window(days)
+        price_repo = StockPrice1mRepository(session)
+        ranges_by_ticker = await price_repo.get_date_ranges_bulk(
+            [t.id for t in tickers if t.id is not None],
+            start_date,
+            end_date,
+        )
+    logger.info("Found %d active ticker(s) to process", len(tickers))
 
-    logger.info(f"{LogPrefix.BATCH_JOB} Completed")
+    fetcher = YFinanceFetcher(
+        max_retries=settings.batch_max_retries,
+        retry_delay=settings.batch_retry_delay_seconds,
+        max_concurrency=settings.batch_fetch_concurrency,
+    )
+    semaphore = asyncio.Semaphore(max_workers)
+    # 1回のバッチ実行で登録するレコードは同じ登録日時を持つ
+    created_at = datetime.now(UTC)
+
+    async def _process_one(ticker_obj: Ticker) -> int:
+        # AsyncSessionは並行利用できないため銘柄ごとに専用のセッションを使う
+        async with semaphore, session_factory() as ticker_session:
+            service = StockPriceService(
+                ticker_repo=TickerRepository(ticker_session),
+                price_repo=StockPrice1mRepository(ticker_session),
+            )
+            return await service.process_ticker(
+                fetcher=fetcher,
+                ticker_obj=ticker_obj,
+                start_date=start_date,
+                end_date=end_date,
+                dry_run=dry_run,
+                created_at=created_at,
+                existing_ranges=(
+                    ranges_by_ticker.get(ticker_obj.id)
+                    if ticker_obj.id is not None
+                    else None
+                ),
+            )
+
+    # 同時に実行される銘柄数分の接続を先に確立しておく
+    await warm_up_connection_pool(min(max_workers, len(tickers)))
+
+    tasks = [
+        asyncio.create_task(_process_one(ticker_obj)) for ticker_obj in tickers
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # 1銘柄の失敗で他の銘柄の処理は止めず、結果をまとめてログ出力する
+    for ticker_obj, result in zip(tickers, results, strict=True):
+        if isinstance(result, Exception):
+            logger.error(
+                "Error processing ticker %s: %s",
+                ticker_obj.ticker,
+                result,
+                exc_info=result,
+            )
+        elif isinstance(result, BaseException):
+            # キャンセルや割り込みは銘柄単位のエラーとして扱わず送出する
+            raise result
+
+    logger.info(_BATCH_COMPLETED_LOG_MSG)
 
 
 if __name__ == "__main__":
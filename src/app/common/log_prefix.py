@@ -1,8 +1,14 @@
 """ログプレフィックス定数."""
 
+from enum import StrEnum
 
-class LogPrefix:
-    """ロギング用プレフィックス定数."""
+
+class LogPrefix(StrEnum):
+    """ロギング用プレフィックス定数.
+
+    プレフィックス付きのログ書式は各モジュールでimport時に%形式の定数として
+    組み立てておき、引数の埋め込みはログが出力される場合にのみ行わせる。
+    """
 
     BATCH_JOB = "[BATCH_JOB]"
     FETCH_STOCK_DATA = "[FETCH_STOCK_DATA]"
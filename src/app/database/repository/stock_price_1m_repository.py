@@ -1,14 +1,29 @@
 """StockPrice1mテーブルのリポジトリモジュール."""
 
 import logging
+from collections.abc import Sequence
 from datetime import date, datetime
-from typing import Annotated, Any, cast
+from functools import cache
+from operator import itemgetter
+from typing import Annotated, Any, NamedTuple, cast
 from zoneinfo import ZoneInfo
 
+import pandas as pd
+from asyncpg import InterfaceError, PostgresError
 from fastapi import Depends
-from sqlalchemy import func
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    Double,
+    bindparam,
+    func,
+    text,
+)
+from sqlalchemy import select as core_select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -18,6 +33,128 @@ from app.database.model.stock_price_1m import StockPrice1m
 
 logger = logging.getLogger(__name__)
 
+_SQL_ERROR_LOG_FMT = (
+    f"{LogPrefix.INSERT_STOCK_DATA} error context=%s sql=%s params=%s "
+    "sqlstate=%s detail=%s message=%s"
+)
+
+# この件数以上のバッチは列ごとの配列をUNNESTする1文のINSERTで登録する
+UNNEST_THRESHOLD = 100
+# この件数以上のバッチはステージングテーブルへのCOPY経由で登録する
+COPY_THRESHOLD = 5000
+
+
+class StockPrice1mRow(NamedTuple):
+    """stock_prices_1mへ一括登録する1行分の値.
+
+    タプルのままasyncpgへ渡せるよう、フィールド順はINSERT対象カラムの並びと
+    一致させる。価格はfloatで保持し、DB側でNUMERIC(10,2)へ変換する。
+
+    Attributes
+    ----------
+        ticker_id: 銘柄ID (tickers.id)
+        price_datetime: 日時
+        open: 始値
+        high: 高値
+        low: 安値
+        close: 終値
+        volume: 出来高
+        created_at: 登録日時
+
+    """
+
+    ticker_id: int
+    price_datetime: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+    created_at: datetime
+
+
+_STAGE_TABLE_NAME = "stock_prices_1m_stage"
+_INSERT_COLUMNS = StockPrice1mRow._fields
+# 一意制約 (ticker_id, price_datetime) の並びでStockPrice1mRowを取り出すキー
+_UNIQUE_KEY = itemgetter(0, 1)
+# 価格はdouble precisionで受け渡し、NUMERICへの変換はPostgreSQLで行う
+_PRICE_COLUMNS = frozenset({"open", "high", "low", "close"})
+# id列を含めないことでシーケンスを消費せず、NOT NULL制約も引き継がない
+_CREATE_STAGE_TABLE_SQL = (
+    f"CREATE TEMP TABLE {_STAGE_TABLE_NAME} ON COMMIT DROP AS SELECT "
+    + ", ".join(
+        f"{name}::double precision AS {name}"
+        if name in _PRICE_COLUMNS
+        else name
+        for name in _INSERT_COLUMNS
+    )
+    + " FROM stock_prices_1m WITH NO DATA"
+)
+# UNNESTへ渡す列ごとの配列型 (_INSERT_COLUMNS順)
+_UNNEST_ARRAY_TYPES = (
+    "bigint[]",
+    "timestamptz[]",
+    "double precision[]",
+    "double precision[]",
+    "double precision[]",
+    "double precision[]",
+    "bigint[]",
+    "timestamptz[]",
+)
+# 集合ベースのINSERTは登録行をCTEで数え、件数のみを1行で返す
+_COUNTED_INSERT_SQL_TEMPLATE = (
+    "WITH inserted AS ("
+    f"INSERT INTO stock_prices_1m ({', '.join(_INSERT_COLUMNS)}) "
+    "SELECT * FROM {source} "
+    "ON CONFLICT (ticker_id, price_datetime) DO NOTHING RETURNING 1"
+    ") SELECT count(*) FROM inserted"
+)
+_INSERT_FROM_UNNEST_SQL = _COUNTED_INSERT_SQL_TEMPLATE.format(
+    source="unnest("
+    + ", ".join(
+        f"${position}::{array_type}"
+        for position, array_type in enumerate(_UNNEST_ARRAY_TYPES, start=1)
+    )
+    + ")"
+)
+_INSERT_FROM_STAGE_SQL = _COUNTED_INSERT_SQL_TEMPLATE.format(
+    source=_STAGE_TABLE_NAME
+)
+
+
+@cache
+def _compile_insert_sql() -> str:
+    """ON CONFLICT付きINSERT文を位置パラメータ形式で一度だけコンパイル.
+
+    asyncpgへStockPrice1mRowをそのまま渡せるよう、_INSERT_COLUMNS順の
+    $1..$Nで値を束縛する形にする。
+
+    Returns
+    -------
+        コンパイル済みのINSERT文
+
+    """
+    table = cast(Any, StockPrice1m.__table__)  # type: ignore[attr-defined]
+    values = {
+        name: bindparam(
+            name,
+            type_=Double() if name in _PRICE_COLUMNS else table.c[name].type,
+        )
+        for name in _INSERT_COLUMNS
+    }
+    stmt = (
+        pg_insert(table)
+        .values(values)
+        .on_conflict_do_nothing(
+            index_elements=[table.c.ticker_id, table.c.price_datetime]
+        )
+        .returning(table.c.id)
+    )
+    compiled = stmt.compile(
+        dialect=asyncpg_dialect(),  # type: ignore[no-untyped-call]
+    )
+    return str(compiled)
+
 
 class StockPrice1mRepository:
     """StockPrice1mテーブルへのデータアクセスを提供するリポジトリ.
@@ -37,6 +174,7 @@ class StockPrice1mRepository:
 
         """
         self.session = session
+        self._insert_sql = _compile_insert_sql()
 
     async def get_date_ranges(
         self,
@@ -80,6 +218,70 @@ class StockPrice1mRepository:
 
         return [(row.min_dt, row.max_dt, row.count) for row in rows]
 
+    async def get_date_ranges_bulk(
+        self,
+        ticker_ids: Sequence[int],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> dict[int, list[tuple[datetime, datetime, int]]]:
+        """複数銘柄の指定範囲内の既存データの日時範囲を1回のクエリで取得.
+
+        Args:
+        ----
+            ticker_ids: 銘柄IDのリスト
+            start_date: 開始日時
+            end_date: 終了日時
+
+        Returns:
+        -------
+            銘柄IDをキー、get_date_rangesと同形式のリストを値とする辞書。
+            データのない銘柄は空のリストになる。
+
+        """
+        ranges_by_ticker: dict[int, list[tuple[datetime, datetime, int]]] = {
+            ticker_id: [] for ticker_id in ticker_ids
+        }
+        if not ticker_ids:
+            return ranges_by_ticker
+
+        price_date = func.date(StockPrice1m.price_datetime)
+        # SQLModelのselectは5列以上の型付けに対応しないため、Coreのselectを使う。
+        # 銘柄IDは配列1つで束縛し、銘柄数によらず同一のSQL文にする
+        stmt = (
+            core_select(
+                col(StockPrice1m.ticker_id),
+                price_date.label("date"),
+                func.min(StockPrice1m.price_datetime).label("min_dt"),
+                func.max(StockPrice1m.price_datetime).label("max_dt"),
+                func.count().label("count"),
+            )
+            .where(
+                col(StockPrice1m.ticker_id)
+                == func.any(
+                    bindparam(
+                        "ticker_ids",
+                        list(ticker_ids),
+                        type_=ARRAY(BigInteger()),
+                    )
+                ),
+                col(StockPrice1m.price_datetime) >= start_date,
+                col(StockPrice1m.price_datetime) <= end_date,
+            )
+            .group_by(col(StockPrice1m.ticker_id), price_date)
+            .order_by(col(StockPrice1m.ticker_id), "date")
+        )
+
+        # SQLModelのexecはCoreのselectを受け付けないため、セッションの接続で実行する
+        connection = await self.session.connection()
+        result = await connection.execute(stmt)
+        # get_date_rangesと同様、集計列への属性アクセスのためAny経由にする
+        rows: list[Any] = list(result.all())
+        for row in rows:
+            ranges_by_ticker[row.ticker_id].append(
+                (row.min_dt, row.max_dt, row.count)
+            )
+        return ranges_by_ticker
+
     async def get_by_ticker_ids_and_date_range(
         self,
         ticker_ids: list[int],
@@ -121,13 +323,13 @@ class StockPrice1mRepository:
 
     async def bulk_insert(
         self,
-        records: list[StockPrice1m],
+        records: Sequence[StockPrice1mRow],
     ) -> int:
         """株価レコードを一括登録.
 
         Args:
         ----
-            records: 登録するStockPrice1mのリスト
+            records: 登録するStockPrice1mRowのリスト
 
         Returns:
         -------
@@ -141,64 +343,179 @@ class StockPrice1mRepository:
         if not records:
             return 0
 
-        rows = [self._to_insert_row(record) for record in records]
-
         try:
-            stmt = self._build_insert_statement(rows, with_returning=True)
-            result = await self.session.exec(stmt)
-            inserted_count = len(result.all())
+            if len(records) >= COPY_THRESHOLD:
+                inserted_count = await self._insert_via_copy(records)
+            elif len(records) >= UNNEST_THRESHOLD:
+                inserted_count = await self._insert_via_unnest(records)
+            else:
+                inserted_count = await self._insert_via_executemany(records)
+            # いずれの経路もセッションのトランザクション内で登録しているため、
+            # ここで確定する
             await self.session.commit()
-            skipped_count = len(rows) - inserted_count
+            skipped_count = len(records) - inserted_count
             if skipped_count > 0:
                 logger.info(
                     "stock_prices_1m insert completed with duplicates skipped: "
                     "inserted=%s skipped=%s total=%s",
                     inserted_count,
                     skipped_count,
-                    len(rows),
+                    len(records),
                 )
             return inserted_count
-        except SQLAlchemyError as bulk_error:
+        except (SQLAlchemyError, PostgresError, InterfaceError) as bulk_error:
+            # 生接続経由の経路ではasyncpgの例外がSQLAlchemyにラップされない。
+            # クライアント側で検出されるエラー(引数の型不一致など)は
+            # PostgresErrorではなくInterfaceErrorの派生として送出される
+            await self.session.rollback()
+            await self._pinpoint_and_log_bulk_error(records, bulk_error)
+            raise
+        except Exception:
+            # 想定外の例外でも中断状態のトランザクションを次の登録へ持ち越さない
             await self.session.rollback()
-            await self._pinpoint_and_log_bulk_error(rows, bulk_error)
             raise
 
-    def _to_insert_row(self, record: StockPrice1m) -> dict[str, Any]:
-        """StockPrice1mモデルをINSERT用辞書へ変換."""
-        return {
-            "ticker_id": record.ticker_id,
-            "price_datetime": record.price_datetime,
-            "open": record.open,
-            "high": record.high,
-            "low": record.low,
-            "close": record.close,
-            "volume": record.volume,
-            "created_at": record.created_at,
-        }
+    async def bulk_insert_from_frame(
+        self,
+        ticker_id: int,
+        df: pd.DataFrame,
+        created_at: datetime,
+    ) -> int:
+        """株価のDataFrameを行オブジェクトを経由せずに一括登録.
+
+        列ごとにNumPy配列からPythonの値へ変換してStockPrice1mRowを組み立てる。
+
+        Args:
+        ----
+            ticker_id: 銘柄ID
+            df: open, high, low, close, volume列を持つDataFrame
+                (index=タイムゾーン付きdatetime)
+            created_at: 全レコード共通の登録日時
+
+        Returns:
+        -------
+            登録したレコード数
+
+        """
+        if df.empty:
+            return 0
 
-    def _build_insert_statement(
+        prices = df[["open", "high", "low", "close"]].to_numpy(dtype="float64")
+        records = [
+            StockPrice1mRow(
+                ticker_id,
+                price_datetime,
+                open_,
+                high,
+                low,
+                close,
+                volume,
+                created_at,
+            )
+            for price_datetime, (open_, high, low, close), volume in zip(
+                df.index.to_pydatetime().tolist(),
+                prices.tolist(),
+                df["volume"].to_numpy(dtype="int64").tolist(),
+                strict=True,
+            )
+        ]
+        return await self.bulk_insert(records)
+
+    async def _insert_via_executemany(
         self,
-        rows: list[dict[str, Any]],
-        *,
-        with_returning: bool,
-    ) -> Any:
-        """ON CONFLICT付きINSERT文を構築."""
+        rows: Sequence[StockPrice1mRow],
+    ) -> int:
+        """asyncpgのfetchmanyでON CONFLICT付きINSERTとして登録.
+
+        バッチごとの文の構築・コンパイルを経由せず、
+        コンパイル済みのSQLへ行をそのままバインドする。
+
+        Returns
+        -------
+            登録したレコード数
+
+        """
+        connection = await self.session.connection()
+        driver_connection = await self._get_driver_connection(connection)
+        # SQLAlchemyのasyncpgアダプタはトランザクションを最初の文の実行時に
+        # 遅延して開始する。生接続からの実行はこれを経由しないため、
+        # 未開始であればSQLAlchemy経由の軽量な文で開始させてから実行する
+        if not driver_connection.is_in_transaction():
+            await connection.execute(text("SELECT 1"))
+        inserted = await driver_connection.fetchmany(self._insert_sql, rows)
+        return len(inserted)
+
+    async def _insert_via_unnest(self, rows: Sequence[StockPrice1mRow]) -> int:
+        """列ごとの配列をUNNESTで展開するON CONFLICT付きINSERTで登録.
+
+        行数によらず1文・1往復で済み、一時テーブルの作成も不要。
+        配列はasyncpgによりバイナリ形式で送信される。
+
+        Returns
+        -------
+            登録したレコード数
+
+        """
+        connection = await self.session.connection()
+        # SQLAlchemy経由で実行し、セッションのトランザクション内で登録する
+        result = await connection.exec_driver_sql(
+            _INSERT_FROM_UNNEST_SQL, tuple(zip(*rows, strict=True))
+        )
+        inserted_count: int = result.scalar_one()
+        return inserted_count
+
+    async def _insert_via_copy(self, rows: Sequence[StockPrice1mRow]) -> int:
+        """ステージングテーブルへCOPYしてからON CONFLICT付きで本テーブルへ登録.
+
+        一時テーブルはトランザクション終了時に破棄される。
+        行はタプルのまま変換せずにバイナリCOPYへ渡す。
+
+        Returns
+        -------
+            登録したレコード数
+
+        """
+        connection = await self.session.connection()
+        # SQLAlchemy経由で実行してトランザクションを開始させてから、
+        # 同じトランザクション内で生のasyncpg接続からCOPYする
+        await connection.execute(text(_CREATE_STAGE_TABLE_SQL))
+        driver_connection = await self._get_driver_connection(connection)
+        # 一意インデックスのキー順に並べて投入し、B-treeへの挿入位置を局所化する。
+        # 一時テーブルは追記順に走査されるため、本テーブルへもこの順で反映される
+        await driver_connection.copy_records_to_table(
+            _STAGE_TABLE_NAME,
+            records=sorted(rows, key=_UNIQUE_KEY),
+            columns=_INSERT_COLUMNS,
+        )
+        inserted_count: int = await driver_connection.fetchval(
+            _INSERT_FROM_STAGE_SQL
+        )
+        return inserted_count
+
+    async def _get_driver_connection(self, connection: AsyncConnection) -> Any:
+        """SQLAlchemy接続の裏にあるasyncpgの生接続を取得.
+
+        生接続での実行はアダプタの排他制御を経由しないため、
+        セッションを並行するタスク間で共有しないことを前提とする。
+        """
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    def _build_insert_statement(self, rows: Sequence[StockPrice1mRow]) -> Any:
+        """対象行をVALUESに含むON CONFLICT付きINSERT文を構築."""
         table = cast(Any, StockPrice1m.__table__)  # type: ignore[attr-defined]
-        stmt = (
+        return (
             pg_insert(table)
-            .values(rows)
+            .values([row._asdict() for row in rows])
             .on_conflict_do_nothing(
                 index_elements=[table.c.ticker_id, table.c.price_datetime]
             )
         )
-        if with_returning:
-            return stmt.returning(table.c.id)
-        return stmt
 
     async def _pinpoint_and_log_bulk_error(
         self,
-        rows: list[dict[str, Any]],
-        bulk_error: SQLAlchemyError,
+        rows: Sequence[StockPrice1mRow],
+        bulk_error: SQLAlchemyError | PostgresError | InterfaceError,
     ) -> None:
         """バルクINSERT失敗時に原因レコードとSQLを特定してログ出力."""
         self._log_sql_error(
@@ -207,43 +524,68 @@ class StockPrice1mRepository:
             context="bulk_insert_failed",
         )
 
-        for row in rows:
-            try:
-                async with self.session.begin_nested():
-                    stmt = self._build_insert_statement(
-                        [row], with_returning=False
-                    )
-                    await self.session.exec(stmt)
-            except SQLAlchemyError as row_error:
+        # 全体が失敗していることは分かっているため、半分ずつ調べ始める
+        middle = len(rows) // 2
+        await self._bisect_failing_rows(rows[:middle])
+        await self._bisect_failing_rows(rows[middle:])
+        # 原因特定のために登録できた行は破棄し、呼び出し前の状態に戻す
+        await self.session.rollback()
+
+    async def _bisect_failing_rows(
+        self,
+        rows: Sequence[StockPrice1mRow],
+    ) -> None:
+        """二分探索で登録に失敗する行を特定してログ出力.
+
+        対象行をまとめてSAVEPOINT内で登録し、失敗した場合のみ
+        半分に分けて再帰的に調べる。失敗行がk件ならおよそk*log2(n)回の
+        試行で済む。
+        """
+        if not rows:
+            return
+
+        try:
+            async with self.session.begin_nested():
+                connection = await self.session.connection()
+                await connection.exec_driver_sql(self._insert_sql, list(rows))
+        except SQLAlchemyError as error:
+            if len(rows) == 1:
                 self._log_sql_error(
-                    rows=[row],
-                    error=row_error,
+                    rows=rows,
+                    error=error,
                     context="failing_record_identified",
                 )
+                return
+            middle = len(rows) // 2
+            await self._bisect_failing_rows(rows[:middle])
+            await self._bisect_failing_rows(rows[middle:])
 
     def _log_sql_error(
         self,
         *,
-        rows: list[dict[str, Any]],
-        error: SQLAlchemyError,
+        rows: Sequence[StockPrice1mRow],
+        error: SQLAlchemyError | PostgresError | InterfaceError,
         context: str,
     ) -> None:
-        """SQL実行エラーをSQL文とレコード内容付きでログ出力."""
-        stmt = self._build_insert_statement(rows, with_returning=False)
+        """SQL実行エラーをSQL文とレコード内容付きでログ出力.
+
+        エラー時のみ実行されるため、対象行を含む文をその都度コンパイルする。
+        """
+        stmt = self._build_insert_statement(rows)
         sql = str(
             stmt.compile(
                 dialect=self.session.bind.dialect,
                 compile_kwargs={"literal_binds": False},
             )
         )
-        orig = getattr(error, "orig", None)
+        # asyncpgの例外はSQLAlchemyでラップされていないため自身を参照する
+        orig = getattr(error, "orig", error)
         diag = getattr(orig, "diag", None)
         logger.error(
-            f"{LogPrefix.INSERT_STOCK_DATA} error context=%s sql=%s params=%s "
-            "sqlstate=%s detail=%s message=%s",
+            _SQL_ERROR_LOG_FMT,
             context,
             sql,
-            rows,
+            [row._asdict() for row in rows],
             getattr(orig, "sqlstate", None),
             getattr(diag, "message_detail", None),
             str(error),
@@ -3,8 +3,10 @@
 import asyncio
 import logging
 import time
+from collections.abc import Sequence
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
@@ -12,6 +14,20 @@ from app.common.log_prefix import LogPrefix
 
 logger = logging.getLogger(__name__)
 
+_FETCH_ATTEMPT_LOG_FMT = (
+    f"{LogPrefix.FETCH_STOCK_DATA} %s interval=1m start=%s end=%s "
+    "(attempt %s/%s)"
+)
+
+# yfinanceの列名と内部で使う列名の対応 (この順序で列を並べる)
+_COLUMN_MAPPING = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+}
+
 
 class YFinanceFetcher:
     """yfinance ライブラリのラッパークラス.
@@ -22,20 +38,30 @@ class YFinanceFetcher:
     ----------
         max_retries: 最大リトライ回数
         retry_delay: リトライ間隔(秒)
+        max_concurrency: 同時に実行するyfinanceへのリクエスト数の上限
 
     """
 
-    def __init__(self, max_retries: int = 3, retry_delay: int = 5) -> None:
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delay: int = 5,
+        max_concurrency: int = 8,
+    ) -> None:
         """YFinanceFetcherを初期化.
 
         Args:
         ----
             max_retries: 最大リトライ回数
             retry_delay: リトライ間隔(秒)
+            max_concurrency: 同時に実行するyfinanceへのリクエスト数の上限
 
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_concurrency = max_concurrency
+        # インスタンスを共有する全呼び出しで同時リクエスト数を制限する
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
     async def fetch_1m_data(
         self,
@@ -61,13 +87,47 @@ class YFinanceFetcher:
             Exception: 全リトライ失敗時
 
         """
-        return await asyncio.to_thread(
-            self._fetch_1m_data_sync,
-            ticker,
-            start,
-            end,
+        return await self._fetch_1m_data_in_thread(ticker, start, end)
+
+    async def fetch_many_1m_data(
+        self,
+        specs: Sequence[tuple[str, datetime, datetime]],
+    ) -> list[pd.DataFrame | BaseException]:
+        """複数の1分足データをスレッドで並行して取得.
+
+        Args:
+        ----
+            specs: (銘柄コード, 開始日時, 終了日時)のリスト
+
+        Returns:
+        -------
+            specsと同じ順序の取得結果のリスト。
+            全リトライに失敗した要素には発生した例外が入る。
+
+        """
+        return await asyncio.gather(
+            *(
+                self._fetch_1m_data_in_thread(ticker, start, end)
+                for ticker, start, end in specs
+            ),
+            return_exceptions=True,
         )
 
+    async def _fetch_1m_data_in_thread(
+        self,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+    ) -> pd.DataFrame:
+        """同時実行数の上限内で同期版のデータ取得をスレッドで実行."""
+        async with self._semaphore:
+            return await asyncio.to_thread(
+                self._fetch_1m_data_sync,
+                ticker,
+                start,
+                end,
+            )
+
     def _fetch_1m_data_sync(
         self,
         ticker: str,
@@ -94,9 +154,12 @@ class YFinanceFetcher:
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.info(
-                    f"{LogPrefix.FETCH_STOCK_DATA} {ticker} "
-                    f"interval=1m start={start} end={end} "
-                    f"(attempt {attempt}/{self.max_retries})"
+                    _FETCH_ATTEMPT_LOG_FMT,
+                    ticker,
+                    start,
+                    end,
+                    attempt,
+                    self.max_retries,
                 )
 
                 ticker_obj = yf.Ticker(ticker)
@@ -109,18 +172,18 @@ class YFinanceFetcher:
 
                 df = self._validate_and_clean(df, ticker)
 
-                logger.debug(f"{ticker} fetched {len(df)} records")
+                logger.debug("%s fetched %d records", ticker, len(df))
                 return df
 
             except Exception as e:
-                logger.warning(f"{ticker} attempt {attempt} failed: {e}")
+                logger.warning("%s attempt %d failed: %s", ticker, attempt, e)
                 if attempt < self.max_retries:
                     logger.info(
-                        f"{ticker} retrying in {self.retry_delay} seconds..."
+                        "%s retrying in %d seconds...", ticker, self.retry_delay
                     )
                     time.sleep(self.retry_delay)
                 else:
-                    logger.error(f"{ticker} all retries exhausted")
+                    logger.error("%s all retries exhausted", ticker)
                     raise
 
         # 型チェッカーのために追加(実際には到達しない)
@@ -145,27 +208,21 @@ class YFinanceFetcher:
             return df
 
         if df.index.tz is None:
-            logger.warning(f"{ticker}: DataFrame has no timezone, assuming UTC")
+            logger.warning(
+                "%s: DataFrame has no timezone, assuming UTC", ticker
+            )
             df.index = df.index.tz_localize("UTC")
 
-        df = df.rename(
-            columns={
-                "Open": "open",
-                "High": "high",
-                "Low": "low",
-                "Close": "close",
-                "Volume": "volume",
-            }
-        )
-
-        needed_cols = ["open", "high", "low", "close", "volume"]
-        df = df[needed_cols]
+        # 列を選択してから改名することで、不要列のコピーを避ける
+        df = df[list(_COLUMN_MAPPING)].rename(columns=_COLUMN_MAPPING)
 
-        original_len = len(df)
-        df = df.dropna()
-        if len(df) < original_len:
+        # 行ごとの判定を避け、NumPy配列上でNaNを含む行をまとめて除外する
+        valid_mask = ~np.isnan(df.to_numpy(dtype="float64")).any(axis=1)
+        dropped_count = len(df) - int(valid_mask.sum())
+        if dropped_count:
+            df = df[valid_mask]
             logger.warning(
-                f"{ticker}: dropped {original_len - len(df)} rows with NaN values"
+                "%s: dropped %d rows with NaN values", ticker, dropped_count
             )
 
         return df
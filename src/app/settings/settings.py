@@ -19,11 +19,15 @@ class Settings(BaseSettings):
         postgres_user: PostgreSQLユーザー名
         postgres_password: PostgreSQLパスワード
         postgres_database: PostgreSQLデータベース名
+        postgres_pool_size: コネクションプールで常時保持する接続数
+        postgres_max_overflow: プールサイズを超えて一時的に作成できる接続数
         sql_log: SQLログの出力有無(デフォルト: False)
         batch_lookback_days: バッチで取得する過去日数
         batch_max_retries: データ取得時の最大リトライ回数
         batch_retry_delay_seconds: リトライ時の待機秒数
         batch_log_level: バッチ実行時のログレベル
+        batch_concurrency: バッチで同時に処理する銘柄数
+        batch_fetch_concurrency: yfinanceへ同時に送るリクエスト数の上限
         cors_allow_origins: CORSで許可するオリジンのリスト
 
     """
@@ -35,6 +39,8 @@ class Settings(BaseSettings):
     postgres_user: str
     postgres_password: str
     postgres_database: str
+    postgres_pool_size: int = 20
+    postgres_max_overflow: int = 20
 
     cors_allow_origins: list[str] = []
 
@@ -43,6 +49,8 @@ class Settings(BaseSettings):
     batch_max_retries: int = 3
     batch_retry_delay_seconds: int = 5
     batch_log_level: str = "INFO"
+    batch_concurrency: int = 4
+    batch_fetch_concurrency: int = 8
 
     @computed_field  # type: ignore[prop-decorator]
     @property
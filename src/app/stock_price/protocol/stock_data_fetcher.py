@@ -1,5 +1,6 @@
 """株価データ取得のプロトコル定義."""
 
+from collections.abc import Sequence
 from datetime import datetime
 from typing import Protocol
 
@@ -17,3 +18,10 @@ class StockDataFetcher(Protocol):
     ) -> pd.DataFrame:
         """1分足データを取得."""
         ...
+
+    async def fetch_many_1m_data(
+        self,
+        specs: Sequence[tuple[str, datetime, datetime]],
+    ) -> list[pd.DataFrame | BaseException]:
+        """複数の1分足データを並行して取得."""
+        ...
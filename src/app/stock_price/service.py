@@ -1,18 +1,19 @@
 """株価データのサービスモジュール."""
 
 import logging
-from datetime import date, datetime, timedelta
-from decimal import Decimal
+from datetime import UTC, date, datetime, time, timedelta
 from typing import Annotated
 from zoneinfo import ZoneInfo
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 from fastapi import Depends
 
 from app.common.log_prefix import LogPrefix
-from app.database.model.stock_price_1m import StockPrice1m
 from app.database.model.ticker import Ticker
 from app.database.repository.stock_price_1m_repository import (
+    COPY_THRESHOLD,
     StockPrice1mRepository,
     get_stock_price_1m_repository,
 )
@@ -28,13 +29,74 @@ from app.stock_price.schema.dto.stock_price_data_point import (
 from app.stock_price.schema.response.ticker_price_data import TickerPriceData
 
 JST = ZoneInfo("Asia/Tokyo")
+# 日付を1日の範囲(0:00:00から23:59:59.999999まで)へ変換する際の時刻
+_START_OF_DAY = time.min
+_END_OF_DAY = time.max
 
 # 1日あたりの最低レコード数 (東証: 前場150分+後場150分=約300件)
 # これを下回る日は部分欠損とみなして再取得対象にする
 MIN_RECORDS_PER_DAY = 200
 
+# 1回のbulk_insertで登録する最大レコード数
+# 1文・1トランザクションが大きくなりすぎないよう、これを超える分は分割する。
+# COPY経路で登録できる大きさの分割単位を残すため、COPY_THRESHOLDから導出する
+# (yfinanceの1分足は1範囲あたり約3,200件以下のため、バッチではCOPY経路に達しない)
+BULK_INSERT_CHUNK_SIZE = 4 * COPY_THRESHOLD
+
 logger = logging.getLogger(__name__)
 
+# 既存データの日時範囲 (min_datetime, max_datetime, count) のリスト
+DateRanges = list[tuple[datetime, datetime, int]]
+
+_IMPORT_RANGE_LOG_FMT = (
+    f"{LogPrefix.IMPORT_STOCK_DATA} %s: imported %s records for range %s to %s"
+)
+
+
+def get_fetch_window(days: int) -> tuple[datetime, datetime]:
+    """取得対象期間を算出.
+
+    Args:
+    ----
+        days: 取得する過去日数
+
+    Returns:
+    -------
+        (days日前の0時, 現在時刻)のタプル (JST)
+
+    """
+    end_date = datetime.now(JST)
+    start_date = (end_date - timedelta(days=days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return start_date, end_date
+
+
+def _merge_consecutive_days(
+    days: npt.NDArray[np.datetime64],
+) -> tuple[npt.NDArray[np.datetime64], npt.NDArray[np.datetime64]]:
+    """昇順の日付配列を連続する日付の範囲にまとめる.
+
+    隣り合う日付の差が1日でない位置を範囲の境界とし、
+    各範囲の開始日と終了日を配列演算のみで求める。
+
+    Args:
+    ----
+        days: 重複のない昇順の日付配列 (datetime64[D])
+
+    Returns:
+    -------
+        (各範囲の開始日の配列, 各範囲の終了日の配列)のタプル
+
+    """
+    if days.size == 0:
+        return days, days
+
+    breaks = np.flatnonzero(np.diff(days) != np.timedelta64(1, "D"))
+    starts = days[np.concatenate(([0], breaks + 1))]
+    ends = days[np.concatenate((breaks, [days.size - 1]))]
+    return starts, ends
+
 
 class StockPriceService:
     """株価データに関するビジネスロジックを提供するサービス.
@@ -43,6 +105,7 @@ class StockPriceService:
     ----------
         ticker_repo: Tickerリポジトリ
         price_repo: StockPrice1mリポジトリ
+        chunk_size: 1回のbulk_insertで登録する最大レコード数
 
     """
 
@@ -50,6 +113,7 @@ class StockPriceService:
         self,
         ticker_repo: TickerRepository,
         price_repo: StockPrice1mRepository,
+        chunk_size: int = BULK_INSERT_CHUNK_SIZE,
     ) -> None:
         """StockPriceServiceを初期化.
 
@@ -57,10 +121,12 @@ class StockPriceService:
         ----
             ticker_repo: Tickerリポジトリ
             price_repo: StockPrice1mリポジトリ
+            chunk_size: 1回のbulk_insertで登録する最大レコード数
 
         """
         self.ticker_repo = ticker_repo
         self.price_repo = price_repo
+        self.chunk_size = chunk_size
 
     # --- パブリックメソッド ---
 
@@ -115,49 +181,15 @@ class StockPriceService:
             for tid in ticker_ids
         ]
 
-    async def process_all_tickers(
-        self,
-        fetcher: StockDataFetcher,
-        days: int,
-        specific_ticker: str | None = None,
-        dry_run: bool = False,
-    ) -> None:
-        """全アクティブ銘柄の株価データを取得・取り込み.
-
-        Args:
-        ----
-            fetcher: データ取得クライアント
-            days: 取得する過去日数
-            specific_ticker: 特定銘柄のみ処理する場合に指定
-            dry_run: ドライランモード(DB書き込みなし)
-
-        """
-        tickers = await self.ticker_repo.get_active_tickers(
-            specific_ticker=specific_ticker,
-        )
-        logger.info(f"Found {len(tickers)} active ticker(s) to process")
-
-        for ticker_obj in tickers:
-            try:
-                await self.process_ticker(
-                    fetcher=fetcher,
-                    ticker_obj=ticker_obj,
-                    days=days,
-                    dry_run=dry_run,
-                )
-            except Exception as e:
-                logger.error(
-                    f"Error processing ticker {ticker_obj.ticker}: {e}",
-                    exc_info=True,
-                )
-                continue
-
     async def process_ticker(
         self,
         fetcher: StockDataFetcher,
         ticker_obj: Ticker,
-        days: int,
+        start_date: datetime,
+        end_date: datetime,
         dry_run: bool = False,
+        created_at: datetime | None = None,
+        existing_ranges: DateRanges | None = None,
     ) -> int:
         """単一銘柄のデータを取得・取り込み.
 
@@ -165,8 +197,12 @@ class StockPriceService:
         ----
             fetcher: データ取得クライアント
             ticker_obj: 銘柄オブジェクト
-            days: 取得する過去日数
+            start_date: 取得期間の開始日時 (get_fetch_window参照)
+            end_date: 取得期間の終了日時
             dry_run: ドライランモード(DB書き込みなし)
+            created_at: 取り込むレコードの登録日時(省略時は呼び出し時点)
+            existing_ranges: 取得期間内の既存データの日時範囲
+                (取得済みの場合に指定。省略時はDBから取得する)
 
         Returns:
         -------
@@ -176,48 +212,69 @@ class StockPriceService:
         ticker_symbol = ticker_obj.ticker
         ticker_id = ticker_obj.id
         if ticker_id is None:
-            logger.error(f"{ticker_symbol}: ticker id is missing, skipping")
+            logger.error("%s: ticker id is missing, skipping", ticker_symbol)
             return 0
-        logger.info(f"Processing {ticker_symbol}...")
-
-        end_date = datetime.now(JST)
-        start_date = (end_date - timedelta(days=days)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
+        logger.info("Processing %s...", ticker_symbol)
+        if created_at is None:
+            created_at = datetime.now(UTC)
 
         missing_ranges = await self._get_missing_ranges(
-            ticker_id, ticker_symbol, start_date, end_date
+            ticker_id, ticker_symbol, start_date, end_date, existing_ranges
         )
 
         if not missing_ranges:
-            logger.info(f"{ticker_symbol}: all data already imported, skipping")
+            logger.info(
+                "%s: all data already imported, skipping", ticker_symbol
+            )
             return 0
 
         logger.info(
-            f"{ticker_symbol}: found {len(missing_ranges)} gap(s) to fetch"
+            "%s: found %d gap(s) to fetch", ticker_symbol, len(missing_ranges)
+        )
+
+        # 欠損範囲ごとの取得は互いに独立しているため並行して行う
+        results = await fetcher.fetch_many_1m_data(
+            [
+                (ticker_symbol, range_start, range_end)
+                for range_start, range_end in missing_ranges
+            ]
         )
 
         total_imported = 0
-        for range_start, range_end in missing_ranges:
-            try:
-                df = await fetcher.fetch_1m_data(
-                    ticker=ticker_symbol,
-                    start=range_start,
-                    end=range_end,
+        for (range_start, range_end), result in zip(
+            missing_ranges, results, strict=True
+        ):
+            if isinstance(result, Exception):
+                logger.error(
+                    "%s: error fetching/importing range %s to %s: %s",
+                    ticker_symbol,
+                    range_start,
+                    range_end,
+                    result,
                 )
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            df = result
 
+            try:
                 if df.empty:
                     logger.warning(
-                        f"{ticker_symbol}: no data returned for "
-                        f"{range_start} to {range_end}"
+                        "%s: no data returned for %s to %s",
+                        ticker_symbol,
+                        range_start,
+                        range_end,
                     )
                     continue
 
                 if dry_run:
                     logger.info(
-                        f"{ticker_symbol}: DRY RUN - "
-                        f"would import {len(df)} records "
-                        f"for range {range_start} to {range_end}"
+                        "%s: DRY RUN - would import %d records "
+                        "for range %s to %s",
+                        ticker_symbol,
+                        len(df),
+                        range_start,
+                        range_end,
                     )
                     total_imported += len(df)
                     continue
@@ -226,24 +283,31 @@ class StockPriceService:
                     ticker_id=ticker_id,
                     ticker_symbol=ticker_symbol,
                     df=df,
+                    created_at=created_at,
                 )
                 total_imported += imported_count
                 logger.info(
-                    f"{LogPrefix.IMPORT_STOCK_DATA} {ticker_symbol}: "
-                    f"imported {imported_count} records "
-                    f"for range {range_start} to {range_end}"
+                    _IMPORT_RANGE_LOG_FMT,
+                    ticker_symbol,
+                    imported_count,
+                    range_start,
+                    range_end,
                 )
 
             except Exception as e:
                 logger.error(
-                    f"{ticker_symbol}: error fetching/importing range "
-                    f"{range_start} to {range_end}: {e}"
+                    "%s: error fetching/importing range %s to %s: %s",
+                    ticker_symbol,
+                    range_start,
+                    range_end,
+                    e,
                 )
                 continue
 
         logger.info(
-            f"{ticker_symbol}: completed. "
-            f"total imported: {total_imported} records"
+            "%s: completed. total imported: %d records",
+            ticker_symbol,
+            total_imported,
         )
         return total_imported
 
@@ -255,6 +319,7 @@ class StockPriceService:
         ticker_symbol: str,
         start_date: datetime,
         end_date: datetime,
+        existing_ranges: DateRanges | None = None,
     ) -> list[tuple[datetime, datetime]]:
         """既存データと比較して欠損している日時範囲を計算.
 
@@ -267,77 +332,91 @@ class StockPriceService:
             ticker_symbol: 銘柄コード
             start_date: 開始日時
             end_date: 終了日時
+            existing_ranges: 取得済みの既存データの日時範囲(省略時はDBから取得)
 
         Returns:
         -------
             欠損している日時範囲のリスト
 
         """
-        existing_ranges = await self.price_repo.get_date_ranges(
-            ticker_id=ticker_id,
-            start_date=start_date,
-            end_date=end_date,
-        )
+        if existing_ranges is None:
+            existing_ranges = await self.price_repo.get_date_ranges(
+                ticker_id=ticker_id,
+                start_date=start_date,
+                end_date=end_date,
+            )
 
         if not existing_ranges:
             return [(start_date, end_date)]
 
-        # count が閾値以上の日のみ「完了」とみなす
-        complete_dates: set[date] = set()
-        for min_dt, _, count in existing_ranges:
-            if count >= MIN_RECORDS_PER_DAY:
-                complete_dates.add(min_dt.date())
-            else:
-                logger.info(
-                    f"{ticker_symbol}: {min_dt.date()} has only {count} records "
-                    f"(threshold={MIN_RECORDS_PER_DAY}), will re-fetch"
+        # count が閾値以上の日のみ「完了」とみなす (判定は配列上でまとめて行う)
+        existing_days = np.array(
+            [min_dt.date() for min_dt, _, _ in existing_ranges],
+            dtype="datetime64[D]",
+        )
+        counts = np.fromiter(
+            (count for _, _, count in existing_ranges),
+            dtype=np.int64,
+            count=len(existing_ranges),
+        )
+        is_complete = counts >= MIN_RECORDS_PER_DAY
+        complete_days = existing_days[is_complete]
+
+        # 件数不足の日は日ごとではなく銘柄ごとに1行にまとめてログ出力する
+        if not is_complete.all():
+            incomplete_days = list(
+                zip(
+                    existing_days[~is_complete].astype(str).tolist(),
+                    counts[~is_complete].tolist(),
+                    strict=True,
                 )
+            )
+            logger.info(
+                "%s: %d incomplete day(s) below threshold=%d, will re-fetch: "
+                "(date, count)=%s",
+                ticker_symbol,
+                len(incomplete_days),
+                MIN_RECORDS_PER_DAY,
+                incomplete_days,
+            )
 
-        # 欠損日を収集
-        missing_dates: list[date] = []
-        current_date = start_date.date()
-        end_date_only = end_date.date()
-
-        while current_date <= end_date_only:
-            if current_date not in complete_dates:
-                missing_dates.append(current_date)
-            current_date += timedelta(days=1)
+        # 期間内の全日付から完了日を除いた欠損日をNumPyの日付配列上でまとめて求める
+        all_days = np.arange(
+            np.datetime64(start_date.date(), "D"),
+            np.datetime64(end_date.date(), "D") + 1,
+        )
+        missing_days = all_days[~np.isin(all_days, complete_days)]
 
-        if not missing_dates:
+        if missing_days.size == 0:
             return []
 
         # 連続する欠損日をマージ
-        merged: list[tuple[datetime, datetime]] = []
-        range_start_date = missing_dates[0]
-        prev_date = missing_dates[0]
-
-        for d in missing_dates[1:]:
-            if d == prev_date + timedelta(days=1):
-                prev_date = d
-            else:
-                merged.append(
-                    self._to_datetime_range(range_start_date, prev_date)
-                )
-                range_start_date = d
-                prev_date = d
-
-        merged.append(self._to_datetime_range(range_start_date, prev_date))
+        range_starts, range_ends = _merge_consecutive_days(missing_days)
 
-        return merged
+        return [
+            self._to_datetime_range(range_start, range_end)
+            for range_start, range_end in zip(
+                range_starts.tolist(), range_ends.tolist(), strict=True
+            )
+        ]
 
     async def _import_price_data(
         self,
         ticker_id: int,
         ticker_symbol: str,
         df: pd.DataFrame,
+        created_at: datetime,
     ) -> int:
         """DataFrameから株価データをDBに一括登録.
 
+        chunk_size件ごとに分割し、分割単位でコミットする。
+
         Args:
         ----
             ticker_id: 銘柄ID
             ticker_symbol: 銘柄コード
             df: 株価データのDataFrame (index=datetime)
+            created_at: 全レコード共通の登録日時
 
         Returns:
         -------
@@ -346,24 +425,18 @@ class StockPriceService:
         """
         if df.empty:
             logger.warning(
-                f"{ticker_symbol}: empty DataFrame, nothing to import"
+                "%s: empty DataFrame, nothing to import", ticker_symbol
             )
             return 0
 
-        records = []
-        for dt, row in df.iterrows():
-            record = StockPrice1m(
-                ticker_id=ticker_id,
-                price_datetime=dt,
-                open=Decimal(str(row["open"])),
-                high=Decimal(str(row["high"])),
-                low=Decimal(str(row["low"])),
-                close=Decimal(str(row["close"])),
-                volume=int(row["volume"]),
+        imported_count = 0
+        for offset in range(0, len(df), self.chunk_size):
+            imported_count += await self.price_repo.bulk_insert_from_frame(
+                ticker_id,
+                df.iloc[offset : offset + self.chunk_size],
+                created_at,
             )
-            records.append(record)
-
-        return await self.price_repo.bulk_insert(records)
+        return imported_count
 
     def _to_datetime_range(
         self,
@@ -372,8 +445,8 @@ class StockPriceService:
     ) -> tuple[datetime, datetime]:
         """日付ペアをタイムゾーン付きdatetimeの範囲に変換."""
         return (
-            datetime.combine(start, datetime.min.time()).replace(tzinfo=JST),
-            datetime.combine(end, datetime.max.time()).replace(tzinfo=JST),
+            datetime.combine(start, _START_OF_DAY, tzinfo=JST),
+            datetime.combine(end, _END_OF_DAY, tzinfo=JST),
         )
 
 
@@ -1,9 +1,11 @@
 """銘柄APIのルーター定義."""
 
-from typing import Annotated
+from typing import Annotated, cast
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from pydantic import TypeAdapter
 
+from app.database.model.ticker import Ticker
 from app.database.repository.ticker_repository import (
     TickerRepository,
     get_ticker_repository,
@@ -13,10 +15,37 @@ from app.ticker.schema.ticker import TickerResponse
 router = APIRouter(prefix="/tickers", tags=["tickers"])
 
 
+# レスポンスをpydantic-coreで直接JSONへシリアライズするためのアダプタ
+_TICKER_LIST_ADAPTER = TypeAdapter(list[TickerResponse])
+
+
 @router.get("", response_model=list[TickerResponse])
 async def get_tickers(
     repo: Annotated[TickerRepository, Depends(get_ticker_repository)],
-) -> list[TickerResponse]:
-    """登録済みの銘柄一覧を返す."""
+) -> Response:
+    """登録済みの銘柄一覧を返す.
+
+    FastAPIによるレスポンスモデルの再検証とdict経由のJSON変換を省くため、
+    シリアライズ済みのJSONをそのまま返す。
+    response_modelはOpenAPIのスキーマ定義のために指定している。
+    """
     tickers = await repo.get_all()
-    return [TickerResponse.model_validate(t) for t in tickers]
+    return Response(
+        content=_TICKER_LIST_ADAPTER.dump_json(
+            [_to_response(t) for t in tickers]
+        ),
+        media_type="application/json",
+    )
+
+
+def _to_response(ticker: Ticker) -> TickerResponse:
+    """DBから取得済みの型付きの値を検証せずにレスポンスへ詰め替える."""
+    return TickerResponse.model_construct(
+        # DBから取得した行のidは採番済みのためNoneにならない
+        id=cast(int, ticker.id),
+        ticker=ticker.ticker,
+        name=ticker.name,
+        is_active=ticker.is_active,
+        created_at=ticker.created_at,
+        updated_at=ticker.updated_at,
+    )